@@ -6,30 +6,114 @@ Therefore: tick = log(price) / log(1.0001)
 """
 import math
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - fallback path
+    np = None
+
+_LOG_BASE = math.log(1.0001)
+_INV_LOG_BASE = 1.0 / _LOG_BASE
+
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+# Q128.128 values of 1/sqrt(1.0001)^(2^i), as used by TickMath.getSqrtRatioAtTick
+_SQRT_RATIO_FACTORS = (
+    0xfffcb933bd6fad37aa2d162d1a594001,
+    0xfff97272373d413259a46990580e213a,
+    0xfff2e50f5f656932ef12357cf3c7fdcc,
+    0xffe5caca7e10e4e61c3624eaa0941cd0,
+    0xffcb9843d60f6159c9db58835c926644,
+    0xff973b41fa98c081472e6896dfb254c0,
+    0xff2ea16466c96a3843ec78b326b52861,
+    0xfe5dee046a99a2a811c461f1969c3053,
+    0xfcbe86c7900a88aedcffc83b479aa3a4,
+    0xf987a7253ac413176f2b074cf7815e54,
+    0xf3392b0822b70005940c7a398e4b70f3,
+    0xe7159475a2c29b7443b29c7fa6e889d9,
+    0xd097f3bdfd2022b8845ad8f792aa5825,
+    0xa9f746462d870fdf8a65dc1f90e061e5,
+    0x70d869a156d2a1b890bb3df62baf32f7,
+    0x31be135f97d08fd981231505542fcfa6,
+    0x9aa508b5b7a84e1c677de54f3e99bc9,
+    0x5d6af8dedb81196699c329225ee604,
+    0x2216e584f5fa1ea926041bedfe98,
+    0x48a170391f7dc42444e8fa2,
+)
+_MAX_UINT256 = (1 << 256) - 1
+
 def price_to_tick(price):
     """Convert price to tick."""
-    return int(math.floor(math.log(price) / math.log(1.0001)))
+    return math.floor(math.log(price) * _INV_LOG_BASE)
 
 def tick_to_price(tick):
     """Convert tick to price."""
-    return 1.0001 ** tick
+    return math.exp(tick * _LOG_BASE)
+
+def tick_to_price_exact(tick):
+    """Convert tick to sqrtPriceX96, bit-exact with TickMath.getSqrtRatioAtTick."""
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError(f"tick {tick} out of range")
+    ratio = 1 << 128
+    for i, factor in enumerate(_SQRT_RATIO_FACTORS):
+        if abs_tick & (1 << i):
+            ratio = (ratio * factor) >> 128
+    if tick > 0:
+        ratio = _MAX_UINT256 // ratio
+    # Round up when converting from Q128.128 to Q64.96
+    return (ratio >> 32) + (1 if ratio & 0xffffffff else 0)
+
+def price_to_tick_exact(sqrt_price_x96, tick_spacing=1):
+    """Convert sqrtPriceX96 to tick, bit-exact with TickMath.getTickAtSqrtRatio."""
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError(f"sqrtPriceX96 {sqrt_price_x96} out of range")
+    ratio = sqrt_price_x96 << 32
+    msb = ratio.bit_length() - 1
+    r = ratio >> (msb - 127) if msb >= 128 else ratio << (127 - msb)
+
+    # Integer part of log2 in Q64.64, then 14 bits of fractional refinement
+    log_2 = (msb - 128) << 64
+    for bit in range(63, 49, -1):
+        r = (r * r) >> 127
+        f = r >> 128
+        log_2 |= f << bit
+        r >>= f
+
+    log_sqrt10001 = log_2 * 255738958999603826347141  # Q128.128
+    tick_low = (log_sqrt10001 - 3402992956809132418596140100660247210) >> 128
+    tick_hi = (log_sqrt10001 + 291339464771989622907027621153398088495) >> 128
+    if tick_low == tick_hi or tick_to_price_exact(tick_hi) > sqrt_price_x96:
+        tick = tick_low
+    else:
+        tick = tick_hi
+    return align_tick_to_spacing(tick, tick_spacing)
 
 def align_tick_to_spacing(tick, tick_spacing):
     """Align tick to the nearest valid tick spacing."""
     return (tick // tick_spacing) * tick_spacing
 
-print("=" * 80)
-print("UNISWAP V4 TICK CALCULATOR")
-print("=" * 80)
-
-# Parent/ETH Pool Configuration
-print("\n1. PARENT/ETH POOL")
-print("-" * 80)
-print("Target: Parent token price range 0.01 ETH to 0.5 ETH")
-print("Current price: 0.01 ETH per parent token")
-print("Liquidity: 500 parent tokens + corresponding ETH")
-print()
-
+def prices_to_ticks(prices):
+    """Convert a batch of prices to ticks."""
+    if np is None:
+        return [price_to_tick(price) for price in prices]
+    prices = np.asarray(prices, dtype=np.float64)
+    return np.floor(np.log(prices) * _INV_LOG_BASE).astype(np.int64).tolist()
+
+def ticks_to_prices(ticks):
+    """Convert a batch of ticks to prices."""
+    if np is None:
+        return [tick_to_price(tick) for tick in ticks]
+    ticks = np.asarray(ticks, dtype=np.float64)
+    return np.exp(ticks * _LOG_BASE).tolist()
+
+def align_ticks_to_spacing(ticks, tick_spacing):
+    """Align a batch of ticks to the given tick spacing."""
+    return [align_tick_to_spacing(tick, tick_spacing) for tick in ticks]
+
+# Parent/ETH Pool
 # Assuming parent is currency1 (higher address) and ETH is currency0
 # Then price = amount1 / amount0 = parent / ETH
 # If 1 parent = 0.01 ETH, then 1 ETH = 100 parent
@@ -46,36 +130,76 @@ price_eth_lower = 1 / parent_eth_upper  # When parent is expensive, price is low
 price_eth_upper = 1 / parent_eth_lower  # When parent is cheap, price is high
 price_current = 1 / parent_eth_current
 
+# Derivative/Parent pool
+deriv_parent_lower = 0.1  # Parent per derivative (derivative is cheap)
+deriv_parent_upper = 1.0  # Parent per derivative (derivative is expensive)
+deriv_parent_start = 0.1  # Starting price at mint out
+
+# If Parent is currency0, Derivative is currency1, we invert the prices
+price_lower_inv = 1 / deriv_parent_upper  # When derivative is cheap
+price_upper_inv = 1 / deriv_parent_lower  # When derivative is expensive
+price_start_inv = 1 / deriv_parent_start
+
+# Align to tick spacing (common spacings: 1, 10, 60, 200)
+tick_spacing = 60
+tick_spacing_d = 60
+
+# Convert every price in one batch, then align and map back for display
+raw_ticks = prices_to_ticks([
+    price_eth_lower, price_eth_upper, price_current,
+    deriv_parent_lower, deriv_parent_upper, deriv_parent_start,
+    price_lower_inv, price_upper_inv, price_start_inv,
+])
+aligned_ticks = (
+    align_ticks_to_spacing(raw_ticks[:3], tick_spacing)
+    + align_ticks_to_spacing(raw_ticks[3:], tick_spacing_d)
+)
+raw_prices = ticks_to_prices(raw_ticks)
+aligned_prices = ticks_to_prices(aligned_ticks)
+
+(
+    tick_lower, tick_upper, tick_current,
+    tick_lower_d, tick_upper_d, tick_start_d,
+    tick_lower_inv, tick_upper_inv, tick_start_inv,
+) = raw_ticks
+(
+    tick_lower_aligned, tick_upper_aligned, tick_current_aligned,
+    tick_lower_d_aligned, tick_upper_d_aligned, tick_start_d_aligned,
+    tick_lower_inv_aligned, tick_upper_inv_aligned, tick_start_inv_aligned,
+) = aligned_ticks
+
+print("=" * 80)
+print("UNISWAP V4 TICK CALCULATOR")
+print("=" * 80)
+
+# Parent/ETH Pool Configuration
+print("\n1. PARENT/ETH POOL")
+print("-" * 80)
+print("Target: Parent token price range 0.01 ETH to 0.5 ETH")
+print("Current price: 0.01 ETH per parent token")
+print("Liquidity: 500 parent tokens + corresponding ETH")
+print()
+
 print(f"If ETH is currency0 (lower address), Parent is currency1:")
 print(f"  Price = Parent/ETH")
 print(f"  Lower price (parent expensive): {price_eth_lower:.6f} (parent per ETH)")
 print(f"  Upper price (parent cheap): {price_eth_upper:.6f} (parent per ETH)")
 print(f"  Current price: {price_current:.6f} (parent per ETH)")
 
-tick_lower = price_to_tick(price_eth_lower)
-tick_upper = price_to_tick(price_eth_upper)
-tick_current = price_to_tick(price_current)
-
-# Align to tick spacing (common spacings: 1, 10, 60, 200)
-tick_spacing = 60
-tick_lower_aligned = align_tick_to_spacing(tick_lower, tick_spacing)
-tick_upper_aligned = align_tick_to_spacing(tick_upper, tick_spacing)
-tick_current_aligned = align_tick_to_spacing(tick_current, tick_spacing)
-
 print(f"\n  Raw ticks:")
-print(f"    tickLower: {tick_lower} (price: {tick_to_price(tick_lower):.6f})")
-print(f"    tickUpper: {tick_upper} (price: {tick_to_price(tick_upper):.6f})")
-print(f"    tickCurrent: {tick_current} (price: {tick_to_price(tick_current):.6f})")
+print(f"    tickLower: {tick_lower} (price: {raw_prices[0]:.6f})")
+print(f"    tickUpper: {tick_upper} (price: {raw_prices[1]:.6f})")
+print(f"    tickCurrent: {tick_current} (price: {raw_prices[2]:.6f})")
 
 print(f"\n  Aligned to tick spacing {tick_spacing}:")
-print(f"    tickLower: {tick_lower_aligned} (price: {tick_to_price(tick_lower_aligned):.6f})")
-print(f"    tickUpper: {tick_upper_aligned} (price: {tick_to_price(tick_upper_aligned):.6f})")
-print(f"    tickCurrent: {tick_current_aligned} (price: {tick_to_price(tick_current_aligned):.6f})")
+print(f"    tickLower: {tick_lower_aligned} (price: {aligned_prices[0]:.6f})")
+print(f"    tickUpper: {tick_upper_aligned} (price: {aligned_prices[1]:.6f})")
+print(f"    tickCurrent: {tick_current_aligned} (price: {aligned_prices[2]:.6f})")
 
 # Calculate sqrtPriceX96 for current price
 sqrt_price = math.sqrt(price_current)
 sqrt_price_x96 = int(sqrt_price * (2 ** 96))
-print(f"\n  sqrtPriceX96: {sqrt_price_x96}")
+print(f"\n  sqrtPriceX96: {sqrt_price_x96} (tick: {price_to_tick_exact(sqrt_price_x96)})")
 
 # Calculate required amounts for liquidity
 # For a position at current price with 500 tokens
@@ -92,11 +216,6 @@ print("Target: Derivative priced 0.1 parent token to 1 parent token")
 print("At mint out: Start at 0.1 parent per derivative")
 print()
 
-# Derivative/Parent pool
-deriv_parent_lower = 0.1  # Parent per derivative (derivative is cheap)
-deriv_parent_upper = 1.0  # Parent per derivative (derivative is expensive)
-deriv_parent_start = 0.1  # Starting price at mint out
-
 print(f"Scenario 1: If Derivative is currency0, Parent is currency1:")
 print(f"  Price = Parent/Derivative")
 # In this case, prices are directly as stated
@@ -104,61 +223,39 @@ print(f"  Lower price: {deriv_parent_lower} (parent per derivative)")
 print(f"  Upper price: {deriv_parent_upper} (parent per derivative)")
 print(f"  Start price: {deriv_parent_start} (parent per derivative)")
 
-tick_lower_d = price_to_tick(deriv_parent_lower)
-tick_upper_d = price_to_tick(deriv_parent_upper)
-tick_start_d = price_to_tick(deriv_parent_start)
-
-tick_spacing_d = 60
-tick_lower_d_aligned = align_tick_to_spacing(tick_lower_d, tick_spacing_d)
-tick_upper_d_aligned = align_tick_to_spacing(tick_upper_d, tick_spacing_d)
-tick_start_d_aligned = align_tick_to_spacing(tick_start_d, tick_spacing_d)
-
 print(f"\n  Raw ticks:")
-print(f"    tickLower: {tick_lower_d} (price: {tick_to_price(tick_lower_d):.6f})")
-print(f"    tickUpper: {tick_upper_d} (price: {tick_to_price(tick_upper_d):.6f})")
-print(f"    tickStart: {tick_start_d} (price: {tick_to_price(tick_start_d):.6f})")
+print(f"    tickLower: {tick_lower_d} (price: {raw_prices[3]:.6f})")
+print(f"    tickUpper: {tick_upper_d} (price: {raw_prices[4]:.6f})")
+print(f"    tickStart: {tick_start_d} (price: {raw_prices[5]:.6f})")
 
 print(f"\n  Aligned to tick spacing {tick_spacing_d}:")
-print(f"    tickLower: {tick_lower_d_aligned} (price: {tick_to_price(tick_lower_d_aligned):.6f})")
-print(f"    tickUpper: {tick_upper_d_aligned} (price: {tick_to_price(tick_upper_d_aligned):.6f})")
-print(f"    tickStart: {tick_start_d_aligned} (price: {tick_to_price(tick_start_d_aligned):.6f})")
+print(f"    tickLower: {tick_lower_d_aligned} (price: {aligned_prices[3]:.6f})")
+print(f"    tickUpper: {tick_upper_d_aligned} (price: {aligned_prices[4]:.6f})")
+print(f"    tickStart: {tick_start_d_aligned} (price: {aligned_prices[5]:.6f})")
 
 sqrt_price_d = math.sqrt(deriv_parent_start)
 sqrt_price_x96_d = int(sqrt_price_d * (2 ** 96))
-print(f"\n  sqrtPriceX96: {sqrt_price_x96_d}")
+print(f"\n  sqrtPriceX96: {sqrt_price_x96_d} (tick: {price_to_tick_exact(sqrt_price_x96_d)})")
 
 print(f"\n\nScenario 2: If Parent is currency0, Derivative is currency1:")
 print(f"  Price = Derivative/Parent")
-# In this case, we invert the prices
-price_lower_inv = 1 / deriv_parent_upper  # When derivative is cheap
-price_upper_inv = 1 / deriv_parent_lower  # When derivative is expensive
-price_start_inv = 1 / deriv_parent_start
-
 print(f"  Lower price: {price_lower_inv} (derivative per parent)")
 print(f"  Upper price: {price_upper_inv} (derivative per parent)")
 print(f"  Start price: {price_start_inv} (derivative per parent)")
 
-tick_lower_inv = price_to_tick(price_lower_inv)
-tick_upper_inv = price_to_tick(price_upper_inv)
-tick_start_inv = price_to_tick(price_start_inv)
-
-tick_lower_inv_aligned = align_tick_to_spacing(tick_lower_inv, tick_spacing_d)
-tick_upper_inv_aligned = align_tick_to_spacing(tick_upper_inv, tick_spacing_d)
-tick_start_inv_aligned = align_tick_to_spacing(tick_start_inv, tick_spacing_d)
-
 print(f"\n  Raw ticks:")
-print(f"    tickLower: {tick_lower_inv} (price: {tick_to_price(tick_lower_inv):.6f})")
-print(f"    tickUpper: {tick_upper_inv} (price: {tick_to_price(tick_upper_inv):.6f})")
-print(f"    tickStart: {tick_start_inv} (price: {tick_to_price(tick_start_inv):.6f})")
+print(f"    tickLower: {tick_lower_inv} (price: {raw_prices[6]:.6f})")
+print(f"    tickUpper: {tick_upper_inv} (price: {raw_prices[7]:.6f})")
+print(f"    tickStart: {tick_start_inv} (price: {raw_prices[8]:.6f})")
 
 print(f"\n  Aligned to tick spacing {tick_spacing_d}:")
-print(f"    tickLower: {tick_lower_inv_aligned} (price: {tick_to_price(tick_lower_inv_aligned):.6f})")
-print(f"    tickUpper: {tick_upper_inv_aligned} (price: {tick_to_price(tick_upper_inv_aligned):.6f})")
-print(f"    tickStart: {tick_start_inv_aligned} (price: {tick_to_price(tick_start_inv_aligned):.6f})")
+print(f"    tickLower: {tick_lower_inv_aligned} (price: {aligned_prices[6]:.6f})")
+print(f"    tickUpper: {tick_upper_inv_aligned} (price: {aligned_prices[7]:.6f})")
+print(f"    tickStart: {tick_start_inv_aligned} (price: {aligned_prices[8]:.6f})")
 
 sqrt_price_inv = math.sqrt(price_start_inv)
 sqrt_price_x96_inv = int(sqrt_price_inv * (2 ** 96))
-print(f"\n  sqrtPriceX96: {sqrt_price_x96_inv}")
+print(f"\n  sqrtPriceX96: {sqrt_price_x96_inv} (tick: {price_to_tick_exact(sqrt_price_x96_inv)})")
 
 print("\n" + "=" * 80)
 print("\nSUMMARY - RECOMMENDED VALUES")
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import argparse
-import dataclasses
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Iterable, Iterator, NamedTuple, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
+
+try:
+    from .json_output import write_json
+except ImportError:  # pragma: no cover - executed as a script
+    from json_output import write_json  # type: ignore
 
 
 PINATA_BASE_URL = "https://api.pinata.cloud"
@@ -15,8 +22,7 @@ PINATA_UPLOAD_ENDPOINT = f"{PINATA_BASE_URL}/pinning/pinFileToIPFS"
 LOCAL_IPFS_API = "http://127.0.0.1:5001/api/v0/add"
 
 
-@dataclasses.dataclass(slots=True)
-class UploadResult:
+class UploadResult(NamedTuple):
     """Capture information returned after uploading a file to IPFS."""
 
     cid: str
@@ -39,6 +45,7 @@ class IPFSUploader:
         ipfs_api_url: str = LOCAL_IPFS_API,
         cid_version: int = 1,
         timeout: int = 120,
+        max_workers: int = 8,
     ) -> None:
         if mode not in {"pinata", "local"}:
             raise ValueError("mode must be 'pinata' or 'local'")
@@ -51,6 +58,11 @@ class IPFSUploader:
         self.ipfs_api_url = ipfs_api_url
         self.cid_version = cid_version
         self.timeout = timeout
+        self.max_workers = max_workers
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
         if self.mode == "pinata" and not self._has_pinata_credentials:
             raise ValueError(
                 "Pinata mode selected but no credentials provided."
@@ -75,11 +87,16 @@ class IPFSUploader:
     def upload_directory(self, directory: Path) -> list[UploadResult]:
         if not directory.exists() or not directory.is_dir():
             raise NotADirectoryError(directory)
-        results: list[UploadResult] = []
-        for file_path in sorted(directory.iterdir()):
-            if file_path.is_file():
-                results.append(self.upload_path(file_path))
-        return results
+        return list(self.upload_paths(_scan_files(directory)))
+
+    def upload_paths(self, paths: Iterable[Path]) -> Iterator[UploadResult]:
+        """Upload files concurrently, yielding results in input order."""
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            yield from executor.map(self.upload_path, paths)
+        finally:
+            # On the first failure, drop queued uploads instead of waiting on them
+            executor.shutdown(cancel_futures=True)
 
     def _upload_via_pinata(self, target: Path) -> UploadResult:
         headers = {}
@@ -93,11 +110,18 @@ class IPFSUploader:
         metadata = json.dumps({"name": target.name})
         options = json.dumps({"cidVersion": self.cid_version})
         with target.open("rb") as handle:
-            files = {"file": (target.name, handle)}
-            response = requests.post(
+            file_size = os.fstat(handle.fileno()).st_size
+            encoder = MultipartEncoder(
+                fields={
+                    "file": (target.name, handle, "application/octet-stream"),
+                    "pinataMetadata": metadata,
+                    "pinataOptions": options,
+                }
+            )
+            headers["Content-Type"] = encoder.content_type
+            response = self._session.post(
                 PINATA_UPLOAD_ENDPOINT,
-                files=files,
-                data={"pinataMetadata": metadata, "pinataOptions": options},
+                data=encoder,
                 headers=headers,
                 timeout=self.timeout,
             )
@@ -107,7 +131,7 @@ class IPFSUploader:
             )
         payload = response.json()
         cid = payload["IpfsHash"]
-        size = int(payload.get("PinSize", target.stat().st_size))
+        size = int(payload.get("PinSize", file_size))
         uri = f"ipfs://{cid}"
         return UploadResult(
             cid=cid,
@@ -120,11 +144,15 @@ class IPFSUploader:
     def _upload_via_local_node(self, target: Path) -> UploadResult:
         params = {"cid-version": str(self.cid_version), "pin": "true"}
         with target.open("rb") as handle:
-            files = {"file": (target.name, handle)}
-            response = requests.post(
+            file_size = os.fstat(handle.fileno()).st_size
+            encoder = MultipartEncoder(
+                fields={"file": (target.name, handle, "application/octet-stream")}
+            )
+            response = self._session.post(
                 self.ipfs_api_url,
                 params=params,
-                files=files,
+                data=encoder,
+                headers={"Content-Type": encoder.content_type},
                 timeout=self.timeout,
             )
         if response.status_code != 200:
@@ -134,7 +162,7 @@ class IPFSUploader:
         payload = response.json()
         cid = payload["Hash"]
         uri = f"ipfs://{cid}"
-        size = target.stat().st_size
+        size = file_size
         return UploadResult(
             cid=cid,
             name=target.name,
@@ -144,12 +172,21 @@ class IPFSUploader:
         )
 
 
+def _scan_files(directory: Path, *, recursive: bool = False) -> Iterator[Path]:
+    # DirEntry caches the file type from the listing, so no per-entry stat is needed
+    with os.scandir(directory) as scan:
+        entries = sorted(scan, key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.is_file():
+            yield Path(entry.path)
+        elif recursive and entry.is_dir(follow_symlinks=False):
+            yield from _scan_files(Path(entry.path), recursive=True)
+
+
 def _iter_image_files(paths: Iterable[Path]) -> Iterable[Path]:
     for path in paths:
         if path.is_dir():
-            for candidate in sorted(path.rglob("*")):
-                if candidate.is_file():
-                    yield candidate
+            yield from _scan_files(path, recursive=True)
         elif path.is_file():
             yield path
 
@@ -187,6 +224,12 @@ def _parse_args() -> argparse.Namespace:
         default=Path(os.getenv("IPFS_MANIFEST_OUT", "ipfs_manifest.json")),
         help="Where to write the manifest summarising uploads",
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=int(os.getenv("IPFS_MAX_WORKERS", "8")),
+        help="Number of files to upload concurrently",
+    )
     return parser.parse_args()
 
 
@@ -196,20 +239,21 @@ def _run_cli() -> None:
         mode=args.mode,
         ipfs_api_url=args.ipfs_api_url,
         cid_version=args.cid_version,
+        max_workers=args.max_workers,
     )
-    all_results: list[UploadResult] = []
-    for path in _iter_image_files(args.paths):
-        result = uploader.upload_path(path)
-        print(json.dumps(dataclasses.asdict(result)))
-        all_results.append(result)
+    files: list[dict] = []
+    for result in uploader.upload_paths(_iter_image_files(args.paths)):
+        entry = result._asdict()
+        print(json.dumps(entry))
+        files.append(entry)
     manifest = {
         "service": uploader.mode,
         "cidVersion": uploader.cid_version,
-        "files": [dataclasses.asdict(result) for result in all_results],
+        "files": files,
     }
     manifest_path = args.manifest_out.resolve()
     manifest_path.parent.mkdir(parents=True, exist_ok=True)
-    manifest_path.write_text(json.dumps(manifest, indent=2))
+    write_json(manifest, manifest_path)
     print(f"Manifest written to {manifest_path}")
 
 
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+
+try:
+    import orjson  # type: ignore
+
+    def write_json(obj: object, path: Path) -> None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+
+except ImportError:  # pragma: no cover - fallback path
+
+    def write_json(obj: object, path: Path) -> None:
+        # Match orjson's output: raw UTF-8 rather than \u escapes
+        path.write_text(json.dumps(obj, indent=2, ensure_ascii=False), encoding="utf-8")
@@ -3,24 +3,55 @@ from __future__ import annotations
 import argparse
 import json
 from dataclasses import dataclass, asdict
+from functools import cached_property
 from pathlib import Path
-from typing import List, Sequence
+from typing import Callable, Iterator, List, Sequence, Tuple
+
+try:
+    from .json_output import write_json
+except ImportError:  # pragma: no cover - executed as a script
+    from json_output import write_json  # type: ignore
 
 
 try:
-    from eth_hash.auto import keccak  # type: ignore
+    from Crypto.Hash import keccak as _keccak  # type: ignore
+
+    def keccak(data: bytes) -> bytes:
+        return _keccak.new(digest_bits=256, data=data).digest()
+
 except ImportError:  # pragma: no cover - fallback path
     try:
         import sha3  # type: ignore
-    except ImportError as exc:  # pragma: no cover - fallback path
-        raise ImportError(
-            "Install eth-hash or pysha3 to compute Keccak-256 hashes"
-        ) from exc
 
-    def keccak(data: bytes) -> bytes:  # type: ignore
-        digest = sha3.keccak_256()
-        digest.update(data)
-        return digest.digest()
+        def keccak(data: bytes) -> bytes:  # type: ignore
+            return sha3.keccak_256(data).digest()
+
+    except ImportError:
+        try:
+            from eth_hash.auto import keccak  # type: ignore
+        except ImportError as exc:
+            raise ImportError(
+                "Install pycryptodome, pysha3 or eth-hash to compute Keccak-256 hashes"
+            ) from exc
+
+
+def _sorted_hash(left: bytes, right: bytes) -> bytes:
+    a, b = (left, right) if left <= right else (right, left)
+    return keccak(a + b)
+
+
+def _unsorted_hash(left: bytes, right: bytes) -> bytes:
+    return keccak(left + right)
+
+
+def _build_layer(
+    nodes: List[bytes], hash_pair: Callable[[bytes, bytes], bytes]
+) -> List[bytes]:
+    lefts = nodes[0::2]
+    rights = nodes[1::2]
+    if len(rights) < len(lefts):
+        rights.append(lefts[-1])
+    return list(map(hash_pair, lefts, rights))
 
 
 @dataclass(frozen=True)
@@ -41,6 +72,7 @@ class MerkleTree:
         if not leaves:
             raise ValueError("Merkle tree requires at least one leaf")
         self.sort_pairs = sort_pairs
+        self._hash_pair = _sorted_hash if sort_pairs else _unsorted_hash
         self.leaves = [keccak(leaf) if hash_leaves else leaf for leaf in leaves]
         self.layers: List[List[bytes]] = []
         self._build_layers()
@@ -49,43 +81,39 @@ class MerkleTree:
         current_layer = self.leaves
         self.layers = [current_layer]
         while len(current_layer) > 1:
-            next_layer: List[bytes] = []
-            for i in range(0, len(current_layer), 2):
-                left = current_layer[i]
-                right = current_layer[i + 1] if i + 1 < len(current_layer) else left
-                combined = self._hash_pair(left, right)
-                next_layer.append(combined)
-            current_layer = next_layer
+            current_layer = _build_layer(current_layer, self._hash_pair)
             self.layers.append(current_layer)
 
-    def _hash_pair(self, left: bytes, right: bytes) -> bytes:
-        if self.sort_pairs and right < left:
-            left, right = right, left
-        return keccak(left + right)
-
     @property
     def root(self) -> bytes:
         return self.layers[-1][0]
 
-    def get_proof(self, index: int) -> List[bytes]:
+    @cached_property
+    def _layers_hex(self) -> List[List[str]]:
+        return [[node.hex() for node in layer] for layer in self.layers]
+
+    def _proof_positions(self, index: int) -> Iterator[Tuple[int, int]]:
         if index < 0 or index >= len(self.leaves):
             raise IndexError("Leaf index out of range")
-        proof: List[bytes] = []
-        for layer in self.layers[:-1]:
-            layer_length = len(layer)
+        for k in range(len(self.layers) - 1):
+            layer_length = len(self.layers[k])
             is_right_node = index % 2
             pair_index = index - 1 if is_right_node else index + 1
             if pair_index < layer_length:
-                proof.append(layer[pair_index])
+                yield k, pair_index
             index //= 2
-        return proof
+
+    def get_proof(self, index: int) -> List[bytes]:
+        layers = self.layers
+        return [layers[k][pair_index] for k, pair_index in self._proof_positions(index)]
 
     def build_hex_proof(self, index: int) -> MerkleProof:
-        proof_bytes = self.get_proof(index)
+        layers_hex = self._layers_hex
+        proof = [layers_hex[k][pair_index] for k, pair_index in self._proof_positions(index)]
         return MerkleProof(
             index=index,
-            leaf=self.leaves[index].hex(),
-            proof=[node.hex() for node in proof_bytes],
+            leaf=layers_hex[0][index],
+            proof=proof,
         )
 
     def build_all_hex_proofs(self) -> List[MerkleProof]:
@@ -98,7 +126,7 @@ def _manifest_leaf(entry: dict) -> bytes:
 
 
 def build_merkle_tree_from_manifest(manifest: Path) -> MerkleTree:
-    manifest_data = json.loads(manifest.read_text())
+    manifest_data = json.loads(manifest.read_text(encoding="utf-8"))
     leaves = [_manifest_leaf(entry) for entry in manifest_data.get("files", [])]
     if not leaves:
         raise ValueError("Manifest does not contain any files")
@@ -119,7 +147,7 @@ def _run_cli() -> None:
         "root": "0x" + tree.root.hex(),
         "proofs": [asdict(proof) for proof in tree.build_all_hex_proofs()],
     }
-    args.out.write_text(json.dumps(output, indent=2))
+    write_json(output, args.out)
     print(f"Merkle root: 0x{tree.root.hex()}")
     print(f"Proofs written to {args.out}")
 